@@ -0,0 +1,1120 @@
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, Gdk, GLib
+import bisect
+import functools
+from collections import OrderedDict, deque
+import hashlib
+import pickle
+import re
+import os
+from functools import partial
+from itertools import islice
+import multiprocessing
+import queue
+import subprocess
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# Serializes every touch of the apt cache; python-apt is not thread-safe.
+apt_lock = threading.Lock()
+
+# Shared worker pools. Unbounded Thread(...).start() per view/card only
+# added context switches: everything contends on apt_lock anyway. Icons
+# get their own pool so apt work cannot starve them, held at exactly one
+# worker: GtkIconTheme is not thread-safe, so every has_icon/load_icon
+# call must come from the same thread.
+_POOL = ThreadPoolExecutor(max_workers=max(2, (os.cpu_count() or 4) - 3),
+                           thread_name_prefix='las')
+_ICON_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix='las-icon')
+
+_CACHE = None
+
+
+def get_cache():
+    # Single shared apt.Cache for the whole process. Opening the cache
+    # costs the better part of a second, so views must never construct
+    # their own; a network refresh is an explicit user action, not a
+    # side effect of rendering a view.
+    global _CACHE
+    with apt_lock:
+        if _CACHE is None:
+            # Imported here rather than at module load: python-apt drags
+            # in the apt_pkg extension and a pile of I/O, which the window
+            # should not pay for before the first view that needs it.
+            import apt
+            _CACHE = apt.Cache()
+        return _CACHE
+
+
+# All UI work scheduled from background threads funnels through one
+# queue drained by a single idle source, so a burst of worker results
+# costs one main-loop wakeup instead of one GLib.idle_add per callback
+# (and GTK only ever sees callbacks from that one source). SimpleQueue:
+# it skips the task-tracking machinery of queue.Queue and its put() is
+# reentrant, so workers pay one lock-free append per callback.
+_IDLE_Q = queue.SimpleQueue()
+_idle_installed = False
+_idle_lock = threading.Lock()
+
+
+def ui_call(fn, *args):
+    global _idle_installed
+    _IDLE_Q.put((fn, args))
+    with _idle_lock:
+        if not _idle_installed:
+            _idle_installed = True
+            GLib.idle_add(_drain_idle)
+
+
+def _drain_idle():
+    global _idle_installed
+    for _ in range(16):
+        try:
+            fn, args = _IDLE_Q.get_nowait()
+        except queue.Empty:
+            with _idle_lock:
+                if _IDLE_Q.empty():
+                    _idle_installed = False
+                    return False
+            return True
+        try:
+            fn(*args)
+        except Exception:
+            # One broken callback must not take the drainer with it: if
+            # the exception propagated, GLib would drop the source while
+            # _idle_installed stayed True and the queue would never be
+            # drained again for the rest of the session.
+            traceback.print_exc()
+    return True
+
+
+FEATURED_APPS = ['firefox', 'gimp', 'vlc', 'libreoffice-writer', 'thunderbird', 'blender']
+
+CATEGORIES = {
+    'Internet': ['firefox', 'thunderbird', 'chromium-browser', 'transmission-gtk', 'filezilla', 'remmina'],
+    'Graphics': ['gimp', 'inkscape', 'krita', 'darktable', 'shotwell', 'blender'],
+    'Multimedia': ['vlc', 'audacity', 'rhythmbox', 'kdenlive', 'handbrake', 'obs-studio'],
+    'Office': ['libreoffice-writer', 'libreoffice-calc', 'evince', 'gnumeric', 'scribus', 'dia'],
+    'Development': ['geany', 'git', 'meld', 'glade', 'devhelp', 'codeblocks'],
+    'Games': ['supertuxkart', 'aisleriot', 'gnome-mines', 'wesnoth', 'frozen-bubble', 'pingus'],
+}
+
+# Packages whose icon name does not match the package name.
+ICON_ALIASES = {
+    'chromium-browser': 'chromium',
+    'obs-studio': 'com.obsproject.Studio',
+    'libreoffice-writer': 'libreoffice-writer',
+    'libreoffice-calc': 'libreoffice-calc',
+}
+
+# Prefixes that mark library/binding packages the Installed view hides;
+# str.startswith takes the whole tuple in one C call.
+_SYSTEM_PREFIXES = ('lib', 'python3-', 'gir1.2-')
+
+# Characters allowed in a search query, compiled once: this runs on
+# every keystroke, and going through re.match would pay the re module's
+# pattern-cache lookup each time.
+_QUERY_RE = re.compile(r'[\w\s.-]*\Z')
+
+DESKTOP_DIRS = [
+    '/usr/share/applications',
+    os.path.expanduser('~/.local/share/applications'),
+]
+
+APT_LISTS_DIR = '/var/lib/apt/lists'
+DPKG_STATUS = '/var/lib/dpkg/status'
+
+
+def _packages_files():
+    try:
+        return sorted(os.path.join(APT_LISTS_DIR, name)
+                      for name in os.listdir(APT_LISTS_DIR)
+                      if name.endswith('_Packages'))
+    except OSError:
+        return []
+
+
+def _index_cache_path():
+    return os.path.join(GLib.get_user_cache_dir(), 'las', 'index.pickle')
+
+
+def _index_cache_key(paths):
+    # Fingerprint of every input the index is derived from: the lists
+    # files and dpkg's status file (the installed flags are baked in).
+    # Any mtime change produces a different key and forces a rebuild.
+    parts = []
+    for path in list(paths) + [DPKG_STATUS]:
+        try:
+            parts.append('%s:%s' % (path, os.path.getmtime(path)))
+        except OSError:
+            continue
+    return hashlib.sha1(''.join(parts).encode()).hexdigest()
+
+
+def _lists_stale(max_age=6 * 3600):
+    # Whether the package lists are old enough to justify a network
+    # fetch. apt update costs ~10s and a pile of round trips; when the
+    # newest lists file is under max_age old it buys nothing.
+    newest = 0
+    for path in _packages_files():
+        try:
+            newest = max(newest, os.path.getmtime(path))
+        except OSError:
+            continue
+    return time.time() - newest > max_age
+
+
+def _stanza_field(stanza, key):
+    # First line of a field in an RFC822-style stanza. key is of the
+    # form b'\nPackage: '; the leading newline anchors it to a field
+    # name rather than a substring of some other value.
+    if stanza.startswith(key[1:]):
+        start = len(key) - 1
+    else:
+        pos = stanza.find(key)
+        if pos < 0:
+            return None
+        start = pos + len(key)
+    end = stanza.find(b'\n', start)
+    if end < 0:
+        end = len(stanza)
+    return stanza[start:end]
+
+
+def _parse_packages_shard(paths):
+    # Runs in a worker process: parse a subset of the lists files into
+    # plain parallel lists, which pickle cheaply back to the parent.
+    # Cross-file dedup and install state stay in the parent.
+    names, names_lower, base, descs = [], [], [], []
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            continue
+        for stanza in data.split(b'\n\n'):
+            raw_name = _stanza_field(stanza, b'\nPackage: ')
+            if not raw_name:
+                continue
+            name = raw_name.decode('ascii', 'replace')
+            raw_desc = _stanza_field(stanza, b'\nDescription: ') or b''
+            names.append(name)
+            names_lower.append(name.lower())
+            base.append(name.partition(':')[0])
+            descs.append(_truncate_desc_bytes(raw_desc))
+    return names, names_lower, base, descs
+
+
+def _finish_index(names, names_lower, base, descs, installed):
+    # Attach a sorted view over the lowered names plus the map back to
+    # the original rows. Prefix queries bisect this instead of scanning:
+    # O(log n) to locate the range against O(n) over the archive.
+    order = sorted(range(len(names_lower)), key=names_lower.__getitem__)
+    # One preferred row per arch-less base name, chosen here so queries
+    # never pay for dedup: the native row (name == base) wins over
+    # arch-qualified duplicates, otherwise the first seen stands.
+    preferred_idx = {}
+    for i, name in enumerate(names):
+        b = base[i]
+        j = preferred_idx.get(b)
+        if j is None or (name == b and names[j] != b):
+            preferred_idx[b] = i
+    preferred = bytearray(len(names))
+    for i in preferred_idx.values():
+        preferred[i] = 1
+    return {'names': names, 'names_lower': names_lower, 'base': base,
+            'desc': descs, 'desc_lower': [d.lower() for d in descs],
+            'installed': installed,
+            'names_sorted': [names_lower[i] for i in order],
+            'sorted_idx': order, 'preferred': preferred}
+
+
+def _installed_names():
+    # Names of installed packages straight from dpkg's status file; one
+    # read and one bytes scan, no apt cache involved.
+    installed = set()
+    try:
+        with open(DPKG_STATUS, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return installed
+    for stanza in data.split(b'\n\n'):
+        if b'\nStatus: install ok installed' not in stanza:
+            continue
+        name = _stanza_field(stanza, b'\nPackage: ')
+        if name:
+            installed.add(name.decode('ascii', 'replace'))
+    return installed
+
+_DESKTOP_INDEX = None
+_DESKTOP_LOCK = threading.Lock()
+
+
+def _desktop_index():
+    # Map of lowercased .desktop basename -> path plus a sorted name list
+    # for prefix matches, built once per process with scandir so icon
+    # lookups never walk the applications directories again.
+    global _DESKTOP_INDEX
+    with _DESKTOP_LOCK:
+        if _DESKTOP_INDEX is None:
+            index = {}
+            for ddir in DESKTOP_DIRS:
+                try:
+                    with os.scandir(ddir) as entries:
+                        for entry in entries:
+                            name = entry.name
+                            if name.endswith('.desktop'):
+                                index.setdefault(name[:-len('.desktop')].lower(), entry.path)
+                except OSError:
+                    continue
+            _DESKTOP_INDEX = (index, sorted(index))
+        return _DESKTOP_INDEX
+
+
+# Pixbufs are immutable and shareable between widgets, so repeat renders
+# of the same package (view switches, re-searches) hit this dict. LRU
+# with a hard cap: each 64px pixbuf is ~16KB, so an unbounded cache
+# would grow without limit as the user pages through search results.
+_PIXBUF_CACHE = OrderedDict()
+_PIXBUF_CACHE_MAX = 512
+
+_ICON_THEME = None
+
+
+def icon_theme():
+    # The default theme handle is invariant; fetch it once instead of a
+    # GObject round-trip per card.
+    global _ICON_THEME
+    if _ICON_THEME is None:
+        _ICON_THEME = Gtk.IconTheme.get_default()
+    return _ICON_THEME
+
+
+def get_icon_for_package(package_name):
+    pixbuf = _PIXBUF_CACHE.get(package_name)
+    if pixbuf is not None:
+        _PIXBUF_CACHE.move_to_end(package_name)
+        return pixbuf
+    pixbuf = _load_icon_pixbuf(package_name)
+    if pixbuf is not None:
+        _PIXBUF_CACHE[package_name] = pixbuf
+        if len(_PIXBUF_CACHE) > _PIXBUF_CACHE_MAX:
+            _PIXBUF_CACHE.popitem(last=False)
+    return pixbuf
+
+
+def _read_desktop_icon(path):
+    # Pull just the Icon= value out of the [Desktop Entry] section. A full
+    # ConfigParser per file is overkill for one key in a hot loop (and the
+    # 3.13 configparser regression makes it worse); this is a single pass
+    # with plain string ops.
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            in_entry = False
+            for line in f:
+                line = line.strip()
+                if line.startswith('['):
+                    if in_entry:
+                        break
+                    in_entry = line == '[Desktop Entry]'
+                elif in_entry and line.startswith('Icon='):
+                    return line[len('Icon='):].strip() or None
+    except OSError:
+        pass
+    return None
+
+
+@functools.lru_cache(maxsize=1024)
+def _lookup_icon_name(package_name):
+    # Work out the icon name from the package's .desktop file; memoized
+    # since every re-render asks for the same handful of names.
+    icon_name = package_name
+    index, sorted_names = _desktop_index()
+    key = package_name.lower()
+    found = index.get(key)
+    if found is None:
+        # Prefix match against the in-memory name list.
+        i = bisect.bisect_left(sorted_names, key)
+        if i < len(sorted_names) and sorted_names[i].startswith(key):
+            found = index[sorted_names[i]]
+    if found:
+        icon_name = _read_desktop_icon(found) or package_name
+    return icon_name
+
+
+def _load_icon_pixbuf(package_name):
+    # Resolve the icon name through the theme, falling back to a generic
+    # executable icon.
+    icon_name = _lookup_icon_name(package_name)
+    # dict.fromkeys dedupes while keeping priority order (the generic
+    # executable icon must stay last) and folds the old fallback block
+    # into the same loop.
+    candidates = dict.fromkeys((
+        icon_name,
+        icon_name.lower().replace('.', '-'),
+        ICON_ALIASES.get(package_name.lower(), ''),
+        'application-x-executable',
+    ))
+    candidates.pop('', None)
+    theme = icon_theme()
+    for name in candidates:
+        if theme.has_icon(name):
+            try:
+                return theme.load_icon(name, 64, 0)
+            except GLib.Error:
+                continue
+    return None
+
+
+def load_icon_async(package_name, callback):
+    # A cached pixbuf is answered right here on the UI thread — a dict
+    # lookup beats a pool dispatch by three orders of magnitude — so
+    # re-rendered views populate with zero thread churn. Only misses do
+    # the filesystem work on the icon pool.
+    pixbuf = _PIXBUF_CACHE.get(package_name)
+    if pixbuf is not None:
+        _PIXBUF_CACHE.move_to_end(package_name)
+        callback(pixbuf)
+        return None
+
+    def worker():
+        ui_call(callback, get_icon_for_package(package_name))
+    return _ICON_POOL.submit(worker)
+
+
+@functools.lru_cache(maxsize=512)
+def get_package_info(package_name):
+    # Memoized; call get_package_info.cache_clear() when a package is
+    # installed or removed so the dialog stops serving stale state.
+    cache = get_cache()
+    info = {'name': package_name, 'description': '', 'version': '',
+            'size': 'unknown', 'installed': False, 'dependencies': []}
+    with apt_lock:
+        if package_name not in cache:
+            return info
+        pkg = cache[package_name]
+        info['installed'] = pkg.is_installed
+        if pkg.versions:
+            version = pkg.versions[0]
+            info['description'] = version.description
+            info['version'] = version.version
+            mb = version.size / (1 << 20)
+            info['size'] = f"{mb:.1f} MB"
+            # islice stops the dependency walk after ten names instead of
+            # materializing hundreds just to slice them away.
+            info['dependencies'] = list(islice(
+                (dep.name for dep_group in version.dependencies for dep in dep_group),
+                10))
+    return info
+
+
+def _truncate_desc(s, limit=120):
+    # Normalize newlines before slicing: the old truncation branch kept
+    # embedded newlines in long descriptions because only the short
+    # branch ran replace().
+    s = s.replace('\n', ' ')
+    return s if len(s) <= limit else s[:limit].rsplit(' ', 1)[0] + '...'
+
+
+def _truncate_desc_bytes(desc, limit=120):
+    # Bytes twin of _truncate_desc for the raw Packages parser. The cut
+    # happens before decoding, so for the whole archive only the ~120
+    # bytes that survive truncation are ever decoded; the stanza's first
+    # Description line carries no newlines, so no normalization either.
+    if len(desc) <= limit:
+        return desc.decode('utf-8', 'replace')
+    cut = desc.rfind(b' ', 0, limit)
+    if cut <= 0:
+        cut = limit
+    return desc[:cut].decode('utf-8', 'replace') + '...'
+
+
+def _pkg_tuple(pkg):
+    # One (name, short description, installed) tuple per package, shared
+    # by every view; the truncation runs exactly once per package.
+    if pkg.is_installed and pkg.installed is not None:
+        full_desc = pkg.installed.summary or ''
+    elif pkg.versions:
+        full_desc = pkg.versions[0].summary or ''
+    else:
+        full_desc = ''
+    return (pkg.name, _truncate_desc(full_desc), pkg.is_installed)
+
+
+def _collect_apps(names):
+    # Single pass over a known name list.
+    cache = get_cache()
+    with apt_lock:
+        return [_pkg_tuple(cache[name]) for name in names if name in cache]
+
+
+class PackageInfoDialog(Gtk.Dialog):
+    def __init__(self, parent, package_name):
+        super().__init__(title=package_name, transient_for=parent, flags=0)
+        self.set_default_size(420, 360)
+        self.add_buttons(Gtk.STOCK_CLOSE, Gtk.ResponseType.CLOSE)
+        self.package_name = package_name
+        self._window = parent
+
+        self.info_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        self.info_box.set_border_width(12)
+        self.get_content_area().add(self.info_box)
+        spinner = Gtk.Spinner()
+        spinner.start()
+        self.info_box.add(spinner)
+
+        # The info fetch may outlive the dialog; never touch destroyed
+        # widgets from its callback.
+        self._alive = True
+        self.connect('destroy', lambda *_: setattr(self, '_alive', False))
+        self.connect('response', lambda dlg, resp: dlg.destroy())
+        self.show_all()
+        _POOL.submit(self.fetch_info)
+
+    def fetch_info(self):
+        info = get_package_info(self.package_name)
+        ui_call(self.update_info, info)
+
+    def update_info(self, info):
+        if not self._alive:
+            return False
+        for child in self.info_box.get_children():
+            self.info_box.remove(child)
+
+        name = Gtk.Label(label=info['name'])
+        name.get_style_context().add_class('info-title')
+        self.info_box.pack_start(name, False, False, 0)
+        if info['version']:
+            self.info_box.pack_start(
+                Gtk.Label(label="Version: %s    Size: %s" % (info['version'], info['size'])),
+                False, False, 0)
+
+        desc = Gtk.Label(label=info['description'])
+        desc.set_line_wrap(True)
+        desc.set_xalign(0)
+        self.info_box.pack_start(desc, True, True, 0)
+
+        if info['dependencies']:
+            deps = Gtk.Label(label="Depends: " + ", ".join(info['dependencies']))
+            deps.set_line_wrap(True)
+            deps.set_xalign(0)
+            self.info_box.pack_start(deps, False, False, 0)
+
+        status = "Installed" if info['installed'] else "Not installed"
+        self.info_box.pack_start(Gtk.Label(label=status), False, False, 0)
+
+        if info['installed']:
+            action = Gtk.Button(label="Remove")
+            action.connect('clicked', partial(self._on_action, self._window.uninstall_package))
+        else:
+            action = Gtk.Button(label="Install")
+            action.connect('clicked', partial(self._on_action, self._window.install_package))
+        self.info_box.pack_start(action, False, False, 0)
+
+        self.show_all()
+        return False
+
+    def _on_action(self, operation, btn):
+        operation(self.package_name)
+        self.destroy()
+
+
+# Window stylesheet, frozen as bytes at import so construction hands it
+# straight to the CssProvider with no per-window build or encode.
+_CSS_BYTES = b"""
+.sidebar { background: #2b2b2b; }
+.sidebar button { color: #ddd; border-radius: 0; }
+.app-card {
+    background: #ffffff;
+    border: 1px solid #d0d0d0;
+    border-radius: 8px;
+    padding: 12px;
+}
+.app-name { font-weight: bold; }
+.app-desc { color: #666; font-size: 9pt; }
+.installed-badge { color: #2e7d32; font-size: 8pt; }
+.section-title { font-size: 13pt; font-weight: bold; padding: 6px; }
+.info-title { font-size: 14pt; font-weight: bold; }
+"""
+
+
+class LASWindow(Gtk.Window):
+    def __init__(self):
+        super().__init__(title="LAS - Linux App Store")
+        self.set_default_size(960, 640)
+        try:
+            self.set_icon(icon_theme().load_icon('system-software-install', 48, 0))
+        except GLib.Error:
+            pass
+
+        provider = Gtk.CssProvider()
+        provider.load_from_data(_CSS_BYTES)
+        Gtk.StyleContext.add_provider_for_screen(
+            Gdk.Screen.get_default(), provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+
+        root = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+        self.add(root)
+
+        sidebar = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        sidebar.get_style_context().add_class('sidebar')
+        sidebar.set_size_request(160, -1)
+        root.pack_start(sidebar, False, False, 0)
+
+        # partial is a C-level callable: cheaper to invoke and smaller to
+        # keep alive for the window's lifetime than one lambda per button.
+        all_button = Gtk.Button(label="Home")
+        all_button.connect("clicked", partial(self._on_nav_clicked, self.show_home))
+        sidebar.pack_start(all_button, False, False, 0)
+        for category in CATEGORIES:
+            button = Gtk.Button(label=category)
+            button.connect("clicked", partial(self._on_category_clicked, category))
+            sidebar.pack_start(button, False, False, 0)
+        installed_button = Gtk.Button(label="Installed")
+        installed_button.connect("clicked", partial(self._on_nav_clicked, self.show_installed))
+        sidebar.pack_start(installed_button, False, False, 0)
+        updates_button = Gtk.Button(label="Updates")
+        updates_button.connect("clicked", partial(self._on_nav_clicked, self.show_updates))
+        sidebar.pack_start(updates_button, False, False, 0)
+        refresh_button = Gtk.Button(label="Refresh")
+        refresh_button.connect("clicked", partial(self._on_nav_clicked, self.refresh_cache))
+        sidebar.pack_start(refresh_button, False, False, 0)
+
+        content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        root.pack_start(content, True, True, 0)
+
+        self.search_entry = Gtk.SearchEntry()
+        self.search_entry.set_placeholder_text("Search packages...")
+        self.search_entry.connect("search-changed", self.on_search_changed)
+        content.pack_start(self.search_entry, False, False, 0)
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        content.pack_start(scrolled, True, True, 0)
+        self.main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        self.main_box.set_border_width(12)
+        scrolled.add(self.main_box)
+
+        self._search_timeout = None
+        self._search_flowbox = None
+        self._pending_query = None
+        self._next_search_at = 0.0
+        self._search_seq = 0
+        self._search_cancel = threading.Event()
+        self._pending_install = []
+        self._pending_remove = []
+        self._apt_flush_id = None
+        self._icon_futures = []
+        # mtime of dpkg's status file at the last (re)open of the shared
+        # cache; searches reopen only when it moves, and never update().
+        self._cache_mtime = None
+        # Structure-of-arrays search index, built once in the background;
+        # searches scan these plain lists instead of the cache's wrapper
+        # objects. None until the first build finishes.
+        self._index = None
+
+        self.show_home()
+        self._submit(self._build_index)
+
+    def _submit(self, fn, *args):
+        # All window work goes through here so a worker that raises does
+        # not vanish into a dropped Future: the exception is routed back
+        # to the main loop as an error dialog.
+        future = _POOL.submit(fn, *args)
+        future.add_done_callback(self._on_worker_done)
+
+    def _on_worker_done(self, future):
+        exc = future.exception()
+        if exc is not None:
+            ui_call(self.show_apt_error, str(exc))
+
+    def _on_nav_clicked(self, view_fn, btn):
+        view_fn()
+
+    def _on_category_clicked(self, category, btn):
+        self.show_category(category)
+
+    def refresh_cache(self):
+        # The one place the app touches the network: an explicit user
+        # action runs 'apt-get update' off the UI thread, then reopens the
+        # shared cache and drops memoized package info. Render paths never
+        # do this implicitly.
+        self._submit(self._do_refresh)
+
+    def _do_refresh(self):
+        # Fresh lists make the fetch a no-op, so skip it and just
+        # re-render from what is already on disk. The fetch itself goes
+        # through _run_apt for the streamed bounded tail and an error
+        # dialog instead of a swallowed failure.
+        if _lists_stale():
+            self._run_apt(['pkexec', 'apt-get', 'update'],
+                          view=self.show_updates)
+            return
+        cache = get_cache()
+        with apt_lock:
+            cache.open(None)
+        get_package_info.cache_clear()
+        ui_call(self.show_updates)
+
+    def clear_main_content(self):
+        # Icon loads queued for the outgoing view are dead weight on the
+        # two icon workers; cancel whatever has not started yet so the
+        # next view's icons do not wait behind them.
+        for future in self._icon_futures:
+            future.cancel()
+        self._icon_futures.clear()
+        for child in self.main_box.get_children():
+            self.main_box.remove(child)
+
+    def _new_flowbox(self):
+        flowbox = Gtk.FlowBox()
+        flowbox.set_valign(Gtk.Align.START)
+        flowbox.set_max_children_per_line(6)
+        flowbox.set_selection_mode(Gtk.SelectionMode.NONE)
+        return flowbox
+
+    def _add_section(self, title):
+        label = Gtk.Label(label=title)
+        label.set_xalign(0)
+        label.get_style_context().add_class('section-title')
+        self.main_box.pack_start(label, False, False, 0)
+        flowbox = self._new_flowbox()
+        self.main_box.pack_start(flowbox, False, False, 0)
+        return flowbox
+
+    def show_home(self):
+        self.clear_main_content()
+        featured_flowbox = self._add_section("Featured")
+        self._submit(self.load_featured, featured_flowbox)
+        for category, apps in CATEGORIES.items():
+            category_flowbox = self._add_section(category)
+            self._submit(self.load_category_apps, apps, category_flowbox, category)
+        self.main_box.show_all()
+
+    def show_category(self, category):
+        self.clear_main_content()
+        flowbox = self._add_section(category)
+        apps = CATEGORIES[category]
+        self._submit(self.load_category_apps, apps, flowbox, category)
+        self.main_box.show_all()
+
+    def load_featured(self, flowbox):
+        apps = _collect_apps(FEATURED_APPS)
+        ui_call(self.populate_flowbox, flowbox, apps)
+
+    def load_category_apps(self, names, flowbox, category):
+        apps = _collect_apps(names)
+        ui_call(self.populate_flowbox, flowbox, apps)
+
+    def show_installed(self):
+        self.clear_main_content()
+        flowbox = self._add_section("Installed applications")
+        self._submit(self.load_installed, flowbox)
+        self.main_box.show_all()
+
+    def load_installed(self, flowbox):
+        # islice stops pulling from the cache iterator as soon as the cap
+        # is reached, so the ~70k-package scan usually ends early.
+        cache = get_cache()
+        with apt_lock:
+            gen = (_pkg_tuple(p) for p in cache
+                   if p.is_installed and not p.name.startswith(_SYSTEM_PREFIXES))
+            apps = list(islice(gen, 100))
+        ui_call(self.populate_flowbox, flowbox, apps)
+
+    def show_updates(self):
+        self.clear_main_content()
+        update_all = Gtk.Button(label="Update all")
+        update_all.connect("clicked", partial(self._on_nav_clicked, self.update_all_packages))
+        self.main_box.pack_start(update_all, False, False, 0)
+        flowbox = self._add_section("Available updates")
+        self._submit(self.load_updates, flowbox)
+        self.main_box.show_all()
+
+    def load_updates(self, flowbox):
+        cache = get_cache()
+        with apt_lock:
+            apps = [_pkg_tuple(pkg) for pkg in cache
+                    if pkg.is_installed and pkg.is_upgradable]
+        ui_call(self.populate_flowbox, flowbox, apps)
+
+    def _cancel_search(self):
+        # Disarm everything a search left behind: the deadline query, the
+        # in-flight scan (which bails on the event and fails the seq
+        # check), and the card batches still streaming into the result
+        # flowbox.
+        self._pending_query = None
+        self._search_cancel.set()
+        self._search_cancel = threading.Event()
+        self._search_seq += 1
+        self._search_flowbox = None
+
+    def on_search_changed(self, entry):
+        query = entry.get_text().strip()
+        if not query:
+            self._cancel_search()
+            self.show_home()
+            return
+        if not _QUERY_RE.match(query):
+            # An invalid query must also disarm the previous one, or
+            # typing 'vlc' then '$' would still fire the search for
+            # 'vlc' under an entry that reads 'vlc$'.
+            self._cancel_search()
+            return
+        # Deadline debounce: a keystroke only records the query and
+        # pushes the deadline out, so the GLib source list is not
+        # mutated per key. One 100ms poller, installed on demand and
+        # self-removing, fires the search once typing pauses for 500ms.
+        self._pending_query = query
+        self._next_search_at = time.monotonic() + 0.5
+        if self._search_timeout is None:
+            self._search_timeout = GLib.timeout_add(100, self._maybe_fire_search)
+
+    def _maybe_fire_search(self):
+        if self._pending_query is None:
+            self._search_timeout = None
+            return False
+        if time.monotonic() < self._next_search_at:
+            return True
+        query, self._pending_query = self._pending_query, None
+        self._search_timeout = None
+        self.on_search(query)
+        return False
+
+    def on_search(self, query):
+        # Supersede any search still running: it keeps the old seq and
+        # its results are dropped in finish_search, and the cancel event
+        # lets its scan loop bail out early instead of finishing for
+        # nothing.
+        self._cancel_search()
+        self.clear_main_content()
+        self._search_flowbox = self._add_section('Results for "%s"' % query)
+        self.main_box.show_all()
+        self._submit(self.search_packages, query, self._search_seq,
+                     self._search_cancel)
+        return False
+
+    def _build_index(self):
+        # Prefer parsing the apt lists files directly: python-apt
+        # allocates a wrapper object per package, which for a full
+        # archive is tens of thousands of PyObjects just to read two
+        # fields. The raw stanzas are split and scanned with plain
+        # bytes ops instead.
+        paths = _packages_files()
+        if not paths:
+            self._build_index_from_cache()
+            return
+        # A previous run's index is reused verbatim while its inputs are
+        # unchanged; loading the pickle is milliseconds against a full
+        # reparse of the archive.
+        key = _index_cache_key(paths)
+        cache_path = _index_cache_path()
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            # The shape check drops pickles written by older builds of
+            # the index alongside ones whose inputs changed.
+            if cached.get('key') == key and 'desc_lower' in cached.get('index', {}):
+                self._index = cached['index']
+                return
+        except (OSError, pickle.PickleError, EOFError):
+            pass
+        # The parse is pure-CPython bytes work, so the GIL serializes it
+        # in threads; shard the files across worker processes instead.
+        # A shard per file caps out at cpu_count; one file stays serial.
+        # forkserver, not the default fork: this runs on a pool thread
+        # with the GTK main thread and icon workers live, and fork()ing
+        # a multi-threaded process can deadlock the children. The
+        # forkserver forks from a clean single-threaded helper.
+        nproc = min(len(paths), os.cpu_count() or 1)
+        if nproc > 1:
+            ctx = multiprocessing.get_context('forkserver')
+            with ctx.Pool(nproc) as pool:
+                shards = pool.map(_parse_packages_shard,
+                                  [paths[i::nproc] for i in range(nproc)])
+        else:
+            shards = [_parse_packages_shard(paths)]
+        names, names_lower, base, descs = [], [], [], []
+        installed = bytearray()
+        have = set()
+        installed_set = _installed_names()
+        for s_names, s_lower, s_base, s_descs in shards:
+            for i, name in enumerate(s_names):
+                if name in have:
+                    continue
+                have.add(name)
+                names.append(name)
+                names_lower.append(s_lower[i])
+                base.append(s_base[i])
+                descs.append(s_descs[i])
+                installed.append(name in installed_set
+                                 or s_base[i] in installed_set)
+        self._index = _finish_index(names, names_lower, base, descs, installed)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp = cache_path + '.tmp'
+            with open(tmp, 'wb') as f:
+                pickle.dump({'key': key, 'index': self._index}, f,
+                            pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+
+    def _build_index_from_cache(self):
+        # Fallback when the lists files are unreadable: iterate apt_pkg's
+        # raw cache instead of apt.Cache. The high-level bindings
+        # allocate a Package wrapper plus an on-demand Version wrapper
+        # per row; apt_pkg hands out the underlying structs and pulls the
+        # summary through one reused PackageRecords lookup.
+        import apt_pkg
+        names, names_lower, base, descs = [], [], [], []
+        installed = bytearray()
+        with apt_lock:
+            apt_pkg.init()
+            cache = apt_pkg.Cache(None)
+            records = apt_pkg.PackageRecords(cache)
+            for pkg in cache.packages:
+                name = pkg.name
+                ver = pkg.current_ver
+                if ver is None and pkg.version_list:
+                    ver = pkg.version_list[0]
+                summary = ''
+                if ver is not None and ver.file_list:
+                    try:
+                        records.lookup(ver.file_list[0])
+                        summary = records.short_desc or ''
+                    except (KeyError, SystemError):
+                        pass
+                names.append(name)
+                names_lower.append(name.lower())
+                base.append(name.partition(':')[0])
+                descs.append(_truncate_desc(summary))
+                installed.append(pkg.current_ver is not None)
+        self._index = _finish_index(names, names_lower, base, descs, installed)
+
+    def search_packages(self, query, seq, cancel):
+        index = self._index
+        if index is None:
+            # Index still building: fall back to a direct cache scan.
+            self._search_cache_scan(query, seq, cancel)
+            return
+        q = query.lower()
+        results = []
+        added = set()
+        names = index['names']
+        descs = index['desc']
+        installed = index['installed']
+        # Dedup was decided at build time: non-preferred arch duplicates
+        # are skipped with one bytearray probe, no per-query base-name
+        # set. The added set only guards the handful of rows the prefix
+        # pass already emitted against the substring top-up.
+        preferred = index['preferred']
+
+        def add(i):
+            if not preferred[i] or i in added:
+                return False
+            added.add(i)
+            results.append((names[i], descs[i], bool(installed[i])))
+            return len(results) >= 100
+
+        # Prefix hits first: most queries are the start of a package
+        # name, and the bisect narrows those to a slice of the sorted
+        # names without touching the rest of the archive.
+        names_sorted = index['names_sorted']
+        sorted_idx = index['sorted_idx']
+        lo = bisect.bisect_left(names_sorted, q)
+        hi = bisect.bisect_left(names_sorted, q + '\uffff', lo)
+        full = False
+        for i in sorted(sorted_idx[lo:hi]):
+            if add(i):
+                full = True
+                break
+        if not full:
+            # Top up with substring matches over names and descriptions
+            # — the fallback cache scan matches summaries too, and the
+            # index path must not return less than it. The added set
+            # keeps the prefix hits from being re-added.
+            desc_lower = index['desc_lower']
+            for i, n in enumerate(index['names_lower']):
+                if not i & 1023 and cancel.is_set():
+                    return
+                if (q in n or q in desc_lower[i]) and add(i):
+                    break
+        ui_call(self.finish_search, seq, results)
+
+    def _search_cache_scan(self, query, seq, cancel):
+        # Runs on the shared cache. The cache is reopened only when dpkg's
+        # status file has actually changed since the last open; a search
+        # never triggers a repository fetch.
+        cache = get_cache()
+        results = []
+        with apt_lock:
+            try:
+                mtime = os.stat('/var/lib/dpkg/status').st_mtime
+            except OSError:
+                mtime = None
+            if mtime != self._cache_mtime:
+                if self._cache_mtime is not None:
+                    cache.open(None)
+                self._cache_mtime = mtime
+            q = query.lower()
+            seen = set()
+            for i, pkg in enumerate(cache):
+                if not i & 1023 and cancel.is_set():
+                    return
+                pkg_name = pkg.name
+                # partition, not a regex: plain C string op in a loop that
+                # runs once per package in the archive.
+                base_name = pkg_name.partition(':')[0]
+                if base_name in seen:
+                    continue
+                if q in pkg_name.lower() or (
+                        pkg.versions and q in pkg.versions[0].summary.lower()):
+                    seen.add(base_name)
+                    results.append(_pkg_tuple(pkg))
+                    if len(results) >= 100:
+                        break
+        ui_call(self.finish_search, seq, results)
+
+    def finish_search(self, seq, results):
+        # A newer search may have started while this one was scanning;
+        # its results would otherwise land after ours and be overwritten.
+        if seq != self._search_seq:
+            return
+        flowbox = self._search_flowbox
+        if flowbox is None:
+            return
+        # Stream the cards in small slices at low priority: the first
+        # screenful is visible within one frame and input/scrolling keep
+        # running between slices instead of stalling on one big insert.
+        GLib.idle_add(self._add_card_batch, flowbox, iter(results), seq,
+                      priority=GLib.PRIORITY_LOW)
+
+    def _add_card_batch(self, flowbox, it, seq):
+        if seq != self._search_seq or flowbox is not self._search_flowbox:
+            return False
+        flowbox.freeze_child_notify()
+        added = 0
+        for app in islice(it, 20):
+            flowbox.add(self.create_app_card(*app))
+            added += 1
+        flowbox.thaw_child_notify()
+        self.main_box.show_all()
+        return added == 20
+
+    def install_package(self, package_name):
+        self._queue_apt_op(self._pending_install, package_name)
+
+    def uninstall_package(self, package_name):
+        self._queue_apt_op(self._pending_remove, package_name)
+
+    def _queue_apt_op(self, pending, package_name):
+        # Coalesce rapid-fire requests into one apt run: each separate
+        # pkexec invocation re-authenticates and re-takes the dpkg lock,
+        # and apt solves the dependency graph once for the whole batch.
+        if package_name not in pending:
+            pending.append(package_name)
+        if self._apt_flush_id is None:
+            self._apt_flush_id = GLib.timeout_add(300, self._flush_apt_ops)
+
+    def _flush_apt_ops(self):
+        self._apt_flush_id = None
+        installs, self._pending_install = self._pending_install, []
+        removes, self._pending_remove = self._pending_remove, []
+        if installs:
+            self._submit(self._run_apt,
+                         ['pkexec', 'apt-get', 'install', '-y'] + installs)
+        if removes:
+            self._submit(self._run_apt,
+                         ['pkexec', 'apt-get', 'remove', '-y'] + removes)
+        return False
+
+    def update_all_packages(self):
+        self._submit(self._run_apt, ['pkexec', 'apt-get', 'upgrade', '-y'])
+
+    def _run_apt(self, cmd, view=None):
+        # Stream apt's output rather than buffering the whole run in a
+        # decoded str: a large upgrade emits megabytes, and the error
+        # dialog only ever shows the tail anyway. view overrides which
+        # view gets rendered after a successful run.
+        tail = deque(maxlen=200)
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, text=True)
+            for line in proc.stdout:
+                tail.append(line)
+            returncode = proc.wait(timeout=1800)
+        except (OSError, subprocess.SubprocessError) as e:
+            ui_call(self.show_apt_error, str(e))
+            return
+        if returncode != 0:
+            ui_call(self.show_apt_error, ''.join(tail))
+            return
+        # Package state changed: reopen the shared cache and drop the
+        # memoized info before re-rendering.
+        cache = get_cache()
+        with apt_lock:
+            cache.open(None)
+        self._cache_mtime = None
+        get_package_info.cache_clear()
+        self._build_index()
+        ui_call(view or self.show_home)
+
+    def show_apt_error(self, message):
+        dialog = Gtk.MessageDialog(
+            parent=self, flags=0, message_type=Gtk.MessageType.ERROR,
+            buttons=Gtk.ButtonsType.CLOSE, text="Package operation failed")
+        dialog.format_secondary_text(message[-2000:])
+        dialog.run()
+        dialog.destroy()
+
+    def populate_flowbox(self, flowbox, apps):
+        # Freeze child-notify while inserting so GTK emits one batch of
+        # layout work instead of relayouting per add(); everything is
+        # shown in a single pass afterwards.
+        flowbox.freeze_child_notify()
+        for app in apps:
+            flowbox.add(self.create_app_card(*app))
+        flowbox.thaw_child_notify()
+        self.main_box.show_all()
+        return False
+
+    def create_app_card(self, name, description, installed):
+        card = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        card.get_style_context().add_class('app-card')
+        card.set_size_request(150, 150)
+
+        image = Gtk.Image.new_from_icon_name('application-x-executable', Gtk.IconSize.DIALOG)
+
+        def update_icon(pixbuf):
+            if pixbuf is not None:
+                image.set_from_pixbuf(pixbuf)
+            return False
+
+        future = load_icon_async(name, update_icon)
+        if future is not None:
+            self._icon_futures.append(future)
+
+        title = Gtk.Label(label=name)
+        title.get_style_context().add_class('app-name')
+        desc = Gtk.Label(label=description)
+        desc.get_style_context().add_class('app-desc')
+        desc.set_line_wrap(True)
+        desc.set_max_width_chars(22)
+
+        card.pack_start(image, False, False, 0)
+        card.pack_start(title, False, False, 0)
+        card.pack_start(desc, True, True, 0)
+        if installed:
+            badge = Gtk.Label(label="Installed")
+            badge.get_style_context().add_class('installed-badge')
+            card.pack_start(badge, False, False, 0)
+
+        event_box = Gtk.EventBox()
+        event_box.add(card)
+        event_box.connect('button-press-event',
+                          lambda w, e, n=name: PackageInfoDialog(self, n))
+        return event_box
@@ -1,8 +1,22 @@
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk
+from gi.repository import Gtk, GLib
 
 class PasswordDialog(Gtk.Dialog):
+    # Client-side shake animation. GTK3 CSS has no transform property, so
+    # the keyframes push the content box around via its margins instead —
+    # still pure client-side drawing, no window-move requests to the
+    # display server (which Wayland ignores for toplevels anyway).
+    SHAKE_MS = 300
+    SHAKE_CSS = b"""
+    @keyframes las-shake {
+        0%, 100% { margin-left: 0px; margin-right: 0px; }
+        12%, 37%, 62%, 87% { margin-left: 20px; margin-right: 0px; }
+        25%, 50%, 75% { margin-left: 0px; margin-right: 20px; }
+    }
+    .las-shake { animation: las-shake 300ms linear; }
+    """
+
     def __init__(self, parent):
         super().__init__(
             title="Authentication Required",
@@ -16,16 +30,24 @@ class PasswordDialog(Gtk.Dialog):
             Gtk.STOCK_OK, Gtk.ResponseType.OK,
         )
 
-        box = self.get_content_area()
         label = Gtk.Label(label="Enter your password to update package list:")
         self.entry = Gtk.Entry()
         self.entry.set_visibility(False)
         self.entry.set_invisible_char('*')
         self.entry.set_activates_default(True)
 
-        box.set_spacing(8)
-        box.add(label)
-        box.add(self.entry)
+        # Build the subtree detached, then attach it in one go so GTK does
+        # a single layout pass instead of one per add().
+        inner = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        inner.pack_start(label, False, False, 0)
+        inner.pack_start(self.entry, False, False, 0)
+        self.get_content_area().add(inner)
+
+        provider = Gtk.CssProvider()
+        provider.load_from_data(self.SHAKE_CSS)
+        inner.get_style_context().add_provider(
+            provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+        self._shake_box = inner
 
         self.set_default_response(Gtk.ResponseType.OK)
         self.show_all()
@@ -34,18 +56,15 @@ class PasswordDialog(Gtk.Dialog):
         return self.entry.get_text()
 
     def shake(self):
-        # Simple shake animation: move window left-right quickly
-        win = self.get_window()
-        if win:
-            x, y = win.get_position()
-            for _ in range(3):
-                win.move(x + 10, y)
-                while Gtk.events_pending():
-                    Gtk.main_iteration()
-                win.move(x - 10, y)
-                while Gtk.events_pending():
-                    Gtk.main_iteration()
-            win.move(x, y)
+        ctx = self._shake_box.get_style_context()
+        if ctx.has_class('las-shake'):
+            return
+        ctx.add_class('las-shake')
+        GLib.timeout_add(self.SHAKE_MS, self._end_shake)
+
+    def _end_shake(self):
+        self._shake_box.get_style_context().remove_class('las-shake')
+        return False
 
     def clear_password(self):
         self.entry.set_text("")
\ No newline at end of file
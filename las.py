@@ -2,152 +2,315 @@
 
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk, GLib, GdkPixbuf
-import threading
+from gi.repository import Gtk, GLib, Gio
 import os
-import subprocess
+import shutil
 
 from core.password_dialog import PasswordDialog
 
 GLADE_FILE = "ui/splash.glade"
 LOGO_FILE = "assets/logo.png"
+RESOURCE_FILE = "las.gresource"
+
+# Compiled UI bundle, built with:
+#   glib-compile-resources las.gresource.xml --target=las.gresource
+# When present the builder reads the mmap'd blob instead of parsing the
+# .glade XML on every launch; otherwise fall back to the plain file.
+try:
+    Gio.resources_register(Gio.Resource.load(RESOURCE_FILE))
+    HAVE_RESOURCES = True
+except GLib.Error:
+    HAVE_RESOURCES = False
 
 class SplashScreen:
+    # Minimum wall time for a password check, so failure latency does not
+    # leak how far PAM got before rejecting.
+    MIN_CHECK_MS = 500
+
     def __init__(self):
-        self.builder = Gtk.Builder()
-        self.builder.add_from_file(GLADE_FILE)
+        self._start_logo_load(LOGO_FILE)
+        if HAVE_RESOURCES:
+            self.builder = Gtk.Builder.new_from_resource('/las/splash.ui')
+        else:
+            self.builder = Gtk.Builder()
+            self.builder.add_from_file(GLADE_FILE)
         self.window = self.builder.get_object("splash_window")
         self.spinner = self.builder.get_object("splash_spinner")
         self.progress = self.builder.get_object("splash_progress")
         self.logo_image = self.builder.get_object("logo_image")
-        self._set_logo(LOGO_FILE)
-        self.progress_fraction = 0.0
         self.process_complete = False
         self.password_attempts = 0
         self.max_attempts = 3
-        self.password = None
+        self._launcher = None
+        self.use_pkexec = False
+        self._pulsing = False
 
-    def _set_logo(self, logo_path):
-        if os.path.exists(logo_path):
-            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(logo_path, 512, 512, True)
-            self.logo_image.set_from_pixbuf(pixbuf)
+    def _start_logo_load(self, logo_path):
+        # Kick off the logo read before the builder parse so the PNG decode
+        # overlaps UI construction. A missing logo just surfaces as a load
+        # error in the callback, so there is no separate exists() probe.
+        cache = os.path.join(GLib.get_user_cache_dir(), 'las', 'logo-512.png')
+        path = logo_path
+        self._logo_cache = cache
+        self._logo_cache_fresh = False
+        try:
+            if os.stat(cache).st_mtime >= os.stat(logo_path).st_mtime:
+                path = cache
+                self._logo_cache_fresh = True
+        except OSError:
+            pass
+        Gio.File.new_for_path(path).load_contents_async(None, self._on_logo_bytes, None)
+
+    def _on_logo_bytes(self, gfile, result, _data):
+        # Imported here so startup skips the GdkPixbuf typelib parse; by
+        # the time the logo bytes arrive the window is already up.
+        from gi.repository import GdkPixbuf
+        try:
+            _ok, data, _etag = gfile.load_contents_finish(result)
+            loader = GdkPixbuf.PixbufLoader.new()
+            loader.set_size(512, 512)
+            loader.write(data)
+            loader.close()
+            pixbuf = loader.get_pixbuf()
+        except GLib.Error:
+            return
+        self.logo_image.set_from_pixbuf(pixbuf)
+        # Persist the downscale so later launches decode the small file
+        # instead of the full-size logo (regenerated on logo mtime change).
+        if not self._logo_cache_fresh:
+            try:
+                os.makedirs(os.path.dirname(self._logo_cache), exist_ok=True)
+                pixbuf.savev(self._logo_cache, 'png', [], [])
+            except (OSError, GLib.Error):
+                pass
 
     def ask_for_password(self):
-        dialog = PasswordDialog(self.window)
-        password = None
-        while self.password_attempts < self.max_attempts:
-            response = dialog.run()
-            if response == Gtk.ResponseType.OK:
-                password = dialog.get_password()
-                if self.check_password(password):
-                    dialog.destroy()
-                    return password
-                else:
-                    self.password_attempts += 1
-                    dialog.shake()   # You must implement shake() in your PasswordDialog!
-                    dialog.clear_password()  # You must implement clear_password()!
+        # Signal-driven: no dialog.run(), so no nested main loop starving
+        # the splash's timers and async I/O while the prompt is up.
+        self.dialog = PasswordDialog(self.window)
+        self.dialog.connect('response', self._on_pw_response)
+
+    def _on_pw_response(self, dialog, response_id):
+        if response_id == Gtk.ResponseType.OK:
+            # Freeze the dialog while sudo verifies the password; the
+            # verdict arrives asynchronously in _on_password_checked.
+            dialog.set_sensitive(False)
+            self.check_password(dialog.get_password())
+        else:
+            dialog.destroy()
+            Gtk.main_quit()
+
+    def _sudo_launcher(self, flags):
+        # Common env for every sudo spawn: the locale is pinned to C so
+        # apt's diagnostics (e.g. the dpkg lock message) are byte-stable
+        # regardless of the user's locale.
+        launcher = Gio.SubprocessLauncher.new(flags)
+        launcher.setenv('LANG', 'C', True)
+        launcher.setenv('LC_ALL', 'C', True)
+        return launcher
+
+    def _shared_launcher(self):
+        # One launcher, set up once and reused for the ticket probe and the
+        # apt run; only the askpass spawn needs its own (it passes a
+        # one-shot inherited fd, which cannot be re-registered).
+        if self._launcher is None:
+            self._launcher = self._sudo_launcher(
+                Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_MERGE)
+        return self._launcher
+
+    def check_password(self, password):
+        # Test the password non-intrusively using 'sudo -S -k -v'. The probe
+        # runs asynchronously so the spinner keeps animating while PAM works,
+        # and a successful probe warms the sudo timestamp so apt can run with
+        # 'sudo -n' afterwards without a second authentication. The password
+        # goes to sudo's stdin in one write; an inherited-fd askpass helper
+        # does not work here because sudo closes every descriptor above
+        # stderr for the programs it runs. The local copy is zeroed once
+        # handed off.
+        self._check_started = GLib.get_monotonic_time()
+        buf = bytearray(password.encode() + b'\n')
+        try:
+            launcher = self._sudo_launcher(
+                Gio.SubprocessFlags.STDIN_PIPE
+                | Gio.SubprocessFlags.STDOUT_SILENCE
+                | Gio.SubprocessFlags.STDERR_SILENCE)
+            proc = launcher.spawnv(['sudo', '-S', '-k', '-v'])
+            stdin = proc.get_stdin_pipe()
+            stdin.write_bytes(GLib.Bytes.new(bytes(buf)), None)
+            stdin.close(None)
+        except (GLib.Error, OSError):
+            self._on_password_checked(False)
+            return
+        finally:
+            buf[:] = bytes(len(buf))
+        proc.wait_async(None, self._on_sudo_done, None)
+
+    def _on_sudo_done(self, proc, result, _data):
+        try:
+            proc.wait_finish(result)
+            ok = proc.get_exit_status() == 0
+        except GLib.Error:
+            ok = False
+        # Pad every verdict to the same minimum wall time.
+        elapsed_ms = (GLib.get_monotonic_time() - self._check_started) // 1000
+        GLib.timeout_add(max(0, self.MIN_CHECK_MS - elapsed_ms), self._on_password_checked, ok)
+
+    def _on_password_checked(self, ok):
+        if ok:
+            self.dialog.destroy()
+            self._ticket_timer = GLib.timeout_add_seconds(60, self._refresh_ticket)
+            self._start_update()
+        else:
+            self.password_attempts += 1
+            if self.password_attempts < self.max_attempts:
+                # The dialog is still up; just unfreeze it for another try.
+                self.dialog.set_sensitive(True)
+                self.dialog.shake()
+                self.dialog.clear_password()
             else:
-                dialog.destroy()
+                self.dialog.destroy()
+                self.show_error_dialog("Wrong Password", "You entered the wrong password three times.")
                 Gtk.main_quit()
-                return None
-        dialog.destroy()
-        self.show_error_dialog("Wrong Password", "You entered the wrong password three times.")
-        GLib.idle_add(Gtk.main_quit)
-        return None
+        return False
 
-    def check_password(self, password):
-        # Test the password non-intrusively using 'sudo -S -v'
+    def _refresh_ticket(self):
+        # Keep the sudo timestamp warm so 'sudo -n' keeps working. Spawned
+        # with posix_spawn (vfork+exec) so this periodic helper skips
+        # fork()'s page-table copy of the whole GTK-loaded interpreter.
         try:
-            proc = subprocess.Popen(
-                ['sudo', '-S', '-k', '-v'],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
+            devnull = os.open(os.devnull, os.O_RDWR)
+            pid = os.posix_spawnp(
+                'sudo', ['sudo', '-n', '-v'], os.environ,
+                file_actions=[
+                    (os.POSIX_SPAWN_DUP2, devnull, 0),
+                    (os.POSIX_SPAWN_DUP2, devnull, 1),
+                    (os.POSIX_SPAWN_DUP2, devnull, 2),
+                ],
             )
-            proc.stdin.write(password + '\n')
-            proc.stdin.flush()
-            proc.stdin.close()
-            proc.wait(timeout=5)
-            return proc.returncode == 0
-        except Exception:
-            return False
+            os.close(devnull)
+            GLib.child_watch_add(GLib.PRIORITY_DEFAULT, pid, lambda _pid, _status: None)
+        except OSError:
+            pass
+        return True
 
     def show(self):
         self.spinner.start()
         self.window.show_all()
-        password = self.ask_for_password()
-        if not password:
+        # Fresh package lists make 'apt update' a no-op, so skip the
+        # fetch and the whole authentication dance and go straight to
+        # the window; the Refresh action remains the explicit way to
+        # force a fetch.
+        from core.main_window import _lists_stale
+        if not _lists_stale():
+            GLib.idle_add(self.on_finish)
             return
-        self.password = password
-        threading.Thread(target=self.long_task, daemon=True).start()
-        GLib.timeout_add(50, self.fake_progress)
+        # Prefer polkit when available: its session agent does the
+        # prompting and caches the authorization for the whole desktop
+        # session, so the in-app password dialog and the sudo ticket
+        # dance are skipped entirely.
+        self.use_pkexec = shutil.which('pkexec') is not None
+        if self.use_pkexec:
+            self._start_update()
+        else:
+            self._probe_ticket()
 
-    def fake_progress(self):
-        if self.process_complete:
-            if self.progress_fraction < 1.0:
-                self.progress_fraction += 0.1
-                if self.progress_fraction > 1.0:
-                    self.progress_fraction = 1.0
-                self.progress.set_fraction(self.progress_fraction)
-                return True
-            else:
-                return False
+    def _probe_ticket(self):
+        # A still-valid sudo ticket means no prompt and no PAM round-trip
+        # at all; only fall back to the dialog when the probe fails.
+        try:
+            proc = self._shared_launcher().spawnv(['sudo', '-n', '-v'])
+        except GLib.Error:
+            self.ask_for_password()
+            return
+        proc.wait_async(None, self._on_ticket_probe, None)
+
+    def _on_ticket_probe(self, proc, result, _data):
+        try:
+            proc.wait_finish(result)
+            ok = proc.get_exit_status() == 0
+        except GLib.Error:
+            ok = False
+        if ok:
+            self._ticket_timer = GLib.timeout_add_seconds(60, self._refresh_ticket)
+            self._start_update()
         else:
-            if self.progress_fraction < 0.8:
-                self.progress_fraction += 0.005
-                if self.progress_fraction > 0.8:
-                    self.progress_fraction = 0.8
-                self.progress.set_fraction(self.progress_fraction)
-            return True
+            self.ask_for_password()
+
+    def _start_update(self):
+        self.long_task()
+        # One progress source for the whole run, reused every tick rather
+        # than re-registered; it removes itself once apt is done. The
+        # pkexec fallback can come back through here, hence the guard.
+        if not self._pulsing:
+            self._pulsing = True
+            GLib.timeout_add(100, self._pulse_tick)
+
+    def _pulse_tick(self):
+        if self.process_complete:
+            self._pulsing = False
+            return False
+        self.progress.pulse()
+        return True
 
     def long_task(self):
-        cmd = ['sudo', '-S', 'apt', 'update']
-        output_lines = []
+        # Spawn 'apt update' asynchronously and stream its output line by
+        # line from the main loop; no worker thread needed.
+        if self.use_pkexec:
+            cmd = ['pkexec', '--disable-internal-agent', 'apt', 'update']
+        else:
+            # The sudo timestamp is already warm from the password check, so
+            # run non-interactively; the password never gets piped to apt.
+            cmd = ['sudo', '-n', 'apt', 'update']
+        # Raw byte accumulator; only decoded once, and only on failure.
+        self.output_buf = bytearray()
         try:
-            proc = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1
-            )
-            try:
-                proc.stdin.write(self.password + '\n')
-                proc.stdin.flush()
-            except Exception as e:
-                GLib.idle_add(self.show_error_dialog, "Failed to send password to sudo", str(e))
-                GLib.idle_add(Gtk.main_quit)
-                return
+            proc = self._shared_launcher().spawnv(cmd)
+        except GLib.Error as e:
+            self.show_error_dialog("Error running apt update", e.message)
+            Gtk.main_quit()
+            return
+        self.apt_proc = proc
+        self.apt_stdout = Gio.DataInputStream.new(proc.get_stdout_pipe())
+        self.apt_stdout.read_line_async(GLib.PRIORITY_DEFAULT, None, self._on_apt_line)
+
+    def _on_apt_line(self, stream, result):
+        try:
+            line, _length = stream.read_line_finish(result)
+        except GLib.Error as e:
+            self.show_error_dialog("Error running apt update", e.message)
+            Gtk.main_quit()
+            return
+        if line is None:
+            self.apt_proc.wait_check_async(None, self._on_apt_done)
+            return
+        self.output_buf += line + b'\n'
+        stream.read_line_async(GLib.PRIORITY_DEFAULT, None, self._on_apt_line)
 
-            for line in proc.stdout:
-                output_lines.append(line)
-            proc.wait()
-            if proc.returncode != 0:
-                error_text = "".join(output_lines)
-                if "Could not get lock" in error_text:
-                    error_message = "Another package manager is currently using apt. Please close it and try again."
-                else:
-                    error_message = error_text.strip() or "Unknown error occurred during apt update."
-                GLib.idle_add(self.show_error_dialog, "apt update failed", error_message)
-                GLib.idle_add(Gtk.main_quit)
+    def _on_apt_done(self, proc, result):
+        try:
+            proc.wait_check_finish(result)
+        except GLib.Error:
+            # The pkexec binary exists on nearly every distro, including
+            # sessions with no polkit agent to answer it; there it fails
+            # straight away with 126/127. Fall back to the sudo path
+            # instead of refusing to start.
+            if self.use_pkexec and proc.get_exit_status() in (126, 127):
+                self.use_pkexec = False
+                self._probe_ticket()
                 return
+            # Scan the raw bytes; only decode when the text is shown.
+            if b"Could not get lock" in self.output_buf:
+                error_message = "Another package manager is currently using apt. Please close it and try again."
             else:
-                print("apt update succeeded.")
-        except Exception as e:
-            GLib.idle_add(self.show_error_dialog, "Error running apt update", str(e))
-            GLib.idle_add(Gtk.main_quit)
+                error_text = self.output_buf.decode('utf-8', 'replace')
+                error_message = error_text.strip() or "Unknown error occurred during apt update."
+            self.show_error_dialog("apt update failed", error_message)
+            Gtk.main_quit()
             return
+        print("apt update succeeded.")
         self.process_complete = True
-        GLib.idle_add(self.check_progress_completion)
-
-    def check_progress_completion(self):
-        if self.progress_fraction >= 1.0:
-            self.on_finish()
-        else:
-            GLib.timeout_add(50, self.check_progress_completion)
-        return False
+        self.progress.set_fraction(1.0)
+        self.on_finish()
 
     def show_error_dialog(self, title, message):
         dialog = Gtk.MessageDialog(
@@ -164,7 +327,10 @@ class SplashScreen:
     def on_finish(self):
         self.spinner.stop()
         self.window.destroy()
-        print("Splash complete! Launch main window here...")
+        from core.main_window import LASWindow
+        win = LASWindow()
+        win.connect("destroy", Gtk.main_quit)
+        win.show_all()
 
 def main():
     splash = SplashScreen()
@@ -172,8 +338,4 @@ def main():
     Gtk.main()
 
 if __name__ == "__main__":
-<<<<<<< HEAD
-    main()
-=======
     main()
->>>>>>> 18439e0 (Initial commit)